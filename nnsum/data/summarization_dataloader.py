@@ -42,6 +42,33 @@ class SummarizationDataLoader(DataLoader):
                                            self.reference_paths, 
                                            self.sentence_texts,
                                            self.pretty_sentence_lengths)
+
+        def split(self, split_size):
+            # Documents are sorted by decreasing length, so the first 
+            # document of each chunk sets that chunk's padded size.
+            batches = []
+            for start in range(0, len(self.id), split_size):
+                stop = start + split_size
+                num_sentences = self.num_sentences[start:stop]
+                doc_size = num_sentences[0].item()
+                sentence_lengths = self.sentence_lengths[start:stop,:doc_size]
+                sent_size = sentence_lengths.max().item()
+                document = self.document[start:stop,:doc_size,:sent_size]
+                if self.targets is not None:
+                    targets = self.targets[start:stop,:doc_size]
+                else:
+                    targets = None
+                if self.reference_paths is not None:
+                    reference_paths = self.reference_paths[start:stop]
+                else:
+                    reference_paths = None
+                batches.append(
+                    self.__class__(self.id[start:stop], document, targets,
+                                   num_sentences, sentence_lengths,
+                                   reference_paths,
+                                   self.sentence_texts[start:stop],
+                                   self.pretty_sentence_lengths[start:stop]))
+            return batches
  
     
 
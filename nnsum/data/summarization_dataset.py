@@ -1,6 +1,7 @@
 import torch
 from torch.utils.data import Dataset
 
+import os
 import pathlib
 import ujson as json
 from collections import defaultdict
@@ -78,12 +79,14 @@ class SummarizationDataset(Dataset):
         sent_size = sent_sizes.max().item()
         
         # Create a document matrix of size doc_size x sent_size. Fill in
-        # the word indices with vocab.
-        document = torch.LongTensor(doc_size, sent_size).fill_(
-            self.vocab.pad_index)
-        for s, sent in enumerate(data["inputs"][:doc_size]):
-            for t, token in enumerate(sent["tokens"]):
-                document[s, t] = self.vocab[token.lower()]
+        # the word indices with vocab. Build the padded rows as lists and
+        # convert once; assigning tensor elements one token at a time is 
+        # much slower.
+        pad = self.vocab.pad_index
+        document = torch.LongTensor(
+            [[self.vocab.index(token.lower()) for token in sent["tokens"]]
+             + [pad] * (sent_size - len(sent["tokens"]))
+             for sent in data["inputs"][:doc_size]])
 
         # Get pretty sentences that are detokenized and their lengths for 
         # generating the actual sentences.
@@ -133,14 +136,15 @@ class SummarizationDataset(Dataset):
             perm = None
 
 
-        for isent, slen, psent, pslen in zip(inp_data["document"], 
-                                      inp_data["sentence_lengths"],
-                                      inp_data["pretty_sentences"],
-                                      inp_data["pretty_sentence_lengths"]):
-            try:
-                assert isent.tolist().index(0) == slen
-            except ValueError:
-                assert isent.size(0) == slen
+        # Padding sanity check; walks every sentence in Python so only run
+        # it when debugging.
+        if os.environ.get("NNSUM_DEBUG"):
+            for isent, slen in zip(inp_data["document"], 
+                                   inp_data["sentence_lengths"]):
+                try:
+                    assert isent.tolist().index(0) == slen
+                except ValueError:
+                    assert isent.size(0) == slen
         
         if self._targets_dir:
             targets_data = self._read_targets(raw_inputs_data, inp_data,
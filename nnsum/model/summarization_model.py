@@ -3,6 +3,15 @@ import torch.nn as nn
 import torch.nn.functional as F
 from torch.autograd import Variable
 
+import copy
+
+
+def _predict_bucket(input):
+    # Padded document shapes are bucketed by powers of two.
+    return (input.document.device,
+            input.document.size(1).bit_length(), 
+            input.document.size(2).bit_length())
+
 
 class SummarizationModel(nn.Module):
     def __init__(self, embedding_layer, sentence_encoder, sentence_extractor):
@@ -12,6 +21,11 @@ class SummarizationModel(nn.Module):
         self.sentence_encoder = sentence_encoder
         self.sentence_extractor = sentence_extractor
 
+        # Largest batch size that is known to fit in memory for predict,
+        # keyed by device and bucketed document shape. Filled in when
+        # predict runs out of memory and has to split a batch.
+        self._predict_batch_limits = {}
+
     def _prepare_input(self, inputs):
         batch_size = inputs.tokens.size(0)
         sent_size = inputs.num_sentences.data.max()
@@ -42,7 +56,9 @@ class SummarizationModel(nn.Module):
         
         srt_input_flat = og_input_flat[argsrt_wc_flat]
         
-        _, inv_order = torch.sort(argsrt_wc_flat)
+        inv_order = torch.empty_like(argsrt_wc_flat)
+        inv_order[argsrt_wc_flat] = torch.arange(
+            argsrt_wc_flat.size(0), device=argsrt_wc_flat.device)
 
         srt_wc = Variable(
             srt_wc_flat.data.masked_fill_(srt_wc_flat.data.eq(0), 1))
@@ -57,10 +73,23 @@ class SummarizationModel(nn.Module):
         documents_srt, sentence_lengths_srt, inv_order = self._sort_sentences(
             documents, sentence_lengths) 
 
-        token_embeddings_srt = self.embeddings(documents_srt)
+        # Padding sentences sort to the end, so only embed and encode the
+        # real sentences and give the padding sentences zero embeddings.
+        num_real_sentences = sentence_lengths.gt(0).sum().item()
+
+        token_embeddings_srt = self.embeddings(
+            documents_srt[:num_real_sentences])
 
         sentence_embeddings_srt = self.sentence_encoder(
-            token_embeddings_srt, sentence_lengths_srt)
+            token_embeddings_srt, sentence_lengths_srt[:num_real_sentences])
+
+        num_padding = documents_srt.size(0) - num_real_sentences
+        if num_padding > 0:
+            sentence_embeddings_srt = torch.cat(
+                [sentence_embeddings_srt, 
+                 sentence_embeddings_srt.new_zeros(
+                     num_padding, sentence_embeddings_srt.size(1))],
+                0)
 
         sentence_embeddings = sentence_embeddings_srt[inv_order].view(
             batch_size, doc_size, -1)
@@ -90,20 +119,24 @@ class SummarizationModel(nn.Module):
 
         return encoded_document
 
+    def _document_mask(self, input):
+        if not self.embeddings.vocab.pad_index is None:
+            return input.document[:,:,0].eq(self.embeddings.vocab.pad_index)
+        else:
+            return None
+
     def forward(self, input, decoder_supervision=None, mask_logits=False,
                 return_attention=False):
 
-        if not self.embeddings.vocab.pad_index is None:
-            mask = input.document[:,:,0].eq(self.embeddings.vocab.pad_index)
-        else:
-            mask = None
+        mask = self._document_mask(input)
 
         encoded_document = self.encode(input, mask=mask)
 
         logits_and_attention = self.sentence_extractor(
             encoded_document,
             input.num_sentences, 
-            targets=decoder_supervision)
+            targets=decoder_supervision,
+            return_attention=return_attention)
 
         if isinstance(logits_and_attention, (list, tuple)):
             logits, attention = logits_and_attention
@@ -119,23 +152,83 @@ class SummarizationModel(nn.Module):
         else:
             return logits 
 
-    def predict(self, input, return_indices=False, max_length=100):
-        logits = self.forward(input, mask_logits=True)
-        batch_size = logits.size(0)
-        _, indices = torch.sort(logits, 1, descending=True)
+    def predict(self, input, return_indices=False, max_length=100,
+                logits=None):
+        # Callers that already ran forward on this batch (e.g. to compute
+        # the validation loss) can pass the logits in to avoid running the
+        # whole model a second time.
+        if logits is not None:
+            return self._predict(input, return_indices=return_indices,
+                                 max_length=max_length, logits=logits)
+
+        batch_size = input.document.size(0)
+        bucket = _predict_bucket(input)
+        # Models pickled before the cache existed do not have it yet.
+        limits = self.__dict__.setdefault("_predict_batch_limits", {})
+        limit = limits.get(bucket)
+        if limit is not None and batch_size > limit:
+            return self._predict_split(
+                input, limit, return_indices, max_length)
+
+        try:
+            return self._predict(input, return_indices=return_indices,
+                                 max_length=max_length)
+        except RuntimeError as e:
+            if "out of memory" not in str(e) or batch_size == 1:
+                raise
+
+        # Out of memory: retry in halves and remember the smaller size for
+        # batches of this shape.
+        torch.cuda.empty_cache()
+        split_size = (batch_size + 1) // 2
+        limits[bucket] = min(split_size, limits.get(bucket, split_size))
+        return self._predict_split(
+            input, split_size, return_indices, max_length)
+
+    def _predict_split(self, input, split_size, return_indices, max_length):
+        all_text = []
+        all_pos = []
+        for input_split in input.split(split_size):
+            text, pos = self.predict(
+                input_split, return_indices=True, max_length=max_length)
+            all_text.extend(text)
+            all_pos.extend(pos)
+
+        if return_indices:
+            return all_text, all_pos
+        else:
+            return all_text
+
+    def _predict(self, input, return_indices=False, max_length=100,
+                 logits=None):
+        with torch.no_grad():
+            if logits is None:
+                logits = self.forward(input, mask_logits=True)
+            else:
+                mask = self._document_mask(input)
+                if mask is not None:
+                    logits = logits.masked_fill(mask, float("-inf"))
+            batch_size = logits.size(0)
+            _, indices = torch.sort(logits, 1, descending=True)
+
+        # Move the rankings to the host once rather than reading them one
+        # tensor element at a time.
+        indices = indices.tolist()
+        num_sentences = input.num_sentences.tolist()
 
         all_pos = []
         all_text = []
         for b in range(batch_size):
+            sentence_lengths = input.pretty_sentence_lengths[b].tolist()
             wc = 0
             text = []
             pos = [] 
-            for i in indices.data[b]:
-                if i >= input.num_sentences.data[b]:
+            for i in indices[b]:
+                if i >= num_sentences[b]:
                     break
                 text.append(input.sentence_texts[b][i])
-                pos.append(int(i))
-                wc += input.pretty_sentence_lengths[b][i]
+                pos.append(i)
+                wc += sentence_lengths[i]
 
                 if wc > max_length:
                     break
@@ -147,6 +240,17 @@ class SummarizationModel(nn.Module):
         else:
             return all_text
 
+    def to_int8_inference(self):
+        """
+        Return a cpu copy of this model for inference with the sentence
+        extractor's GRU/LSTM layers dynamically quantized to int8. The 
+        embeddings and sentence encoder are left in full precision.
+        """
+        model = copy.deepcopy(self).cpu().eval()
+        model.sentence_extractor = torch.quantization.quantize_dynamic(
+            model.sentence_extractor, {nn.GRU, nn.LSTM}, dtype=torch.qint8)
+        return model
+
     def initialize_parameters(self, logger=None):
         if logger:
             logger.info(" Model parameter initialization started.")
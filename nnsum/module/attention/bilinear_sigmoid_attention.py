@@ -22,9 +22,9 @@ class BiLinearSigmoidAttention(nn.Module):
 
 
         raw_scores = torch.bmm(query, context_key.permute(0, 2, 1))
-        for b, l in enumerate(length.data.tolist()):
-            if l < raw_scores.size(2):
-                raw_scores.data[b,:,l:].fill_(float("-inf"))
+        steps = torch.arange(raw_scores.size(2), device=length.device)
+        context_mask = steps.view(1, -1) >= length.view(-1, 1)
+        raw_scores.data.masked_fill_(context_mask.unsqueeze(1), float("-inf"))
 
         #bs = length.size(0)
         #diag_mask = torch.diag(length.data.new(length.data.max()).fill_(1))
@@ -39,9 +39,9 @@ class BiLinearSigmoidAttention(nn.Module):
         #print(scores)
         #input()
 
-        for b, l in enumerate(length.data.tolist()):
-            if l < raw_scores.size(1):
-                scores.data[b,l:].fill_(0)
+        steps = torch.arange(raw_scores.size(1), device=length.device)
+        query_mask = steps.view(1, -1) >= length.view(-1, 1)
+        scores.data.masked_fill_(query_mask.unsqueeze(2), 0)
         
         attended_context = torch.bmm(scores, context)
 
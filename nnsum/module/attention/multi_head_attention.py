@@ -19,19 +19,68 @@ class MultiHeadAttention(nn.Module):
         self.input_heads = nn.ModuleList(input_heads)        
         self.linear = nn.Linear(head_size * num_heads, input_size)
 
-    def forward(self, context, query, values, length):
+    def _project_heads(self, inputs, index):
+        # Apply the index-th projection of every head with a single matmul.
+        # Returns a batch_size x num_heads x steps x head_size tensor.
+        num_heads = len(self.input_heads)
+        weight = torch.cat(
+            [linear_ops[index].weight for linear_ops in self.input_heads], 0)
+        bias = torch.cat(
+            [linear_ops[index].bias for linear_ops in self.input_heads], 0)
+        batch_size, steps, _ = inputs.size()
+        return F.linear(inputs, weight, bias)\
+            .view(batch_size, steps, num_heads, -1)\
+            .permute(0, 2, 1, 3).contiguous()
 
-        all_reads = []
-        all_scores = []
+    def _fused_attention(self, context_w, query_w, values_w, length):
+        # Inputs are kept 4-D with a broadcastable mask so torch can dispatch
+        # to the memory-efficient attention kernel on cuda (the Flash kernel
+        # does not accept a mask). The default 1/sqrt(head_size) scaling
+        # matches self.attention.
+        batch_size = length.size(0)
+        context_steps = context_w.size(2)
+        query_steps = query_w.size(2)
+        steps = torch.arange(
+            max(context_steps, query_steps), device=length.device)
+        pad_mask = steps.view(1, -1) >= length.view(-1, 1)
 
-        for linear_ops in self.input_heads:
-            context_w = linear_ops[0](context)
-            query_w = linear_ops[1](query)
-            values_w = linear_ops[2](values)
+        reads = F.scaled_dot_product_attention(
+            query_w, context_w, values_w,
+            attn_mask=~pad_mask[:,:context_steps].view(
+                batch_size, 1, 1, context_steps))
+        return reads.masked_fill(
+            pad_mask[:,:query_steps].view(batch_size, 1, query_steps, 1), 0)
+
+    def forward(self, context, query, values, length, return_scores=True):
+
+        num_heads = len(self.input_heads)
+        batch_size, query_steps, _ = query.size()
+
+        context_w = self._project_heads(context, 0)
+        query_w = self._project_heads(query, 1)
+        values_w = self._project_heads(values, 2)
+
+        if not return_scores and hasattr(F, "scaled_dot_product_attention"):
+            reads = self._fused_attention(context_w, query_w, values_w, length)
+            scores = None
+        else:
+            # Fold the heads into the batch dimension, head h of batch b
+            # goes to row b * num_heads + h.
+            head_length = length.view(-1, 1).repeat(1, num_heads).view(-1)
             reads, scores = self.attention(
-                context_w, query_w, length, values=values_w)
-            all_reads.append(reads)
-            all_scores.append(scores)
-        all_reads = torch.cat(all_reads, 2)
+                context_w.view(batch_size * num_heads, -1, context_w.size(3)),
+                query_w.view(batch_size * num_heads, -1, query_w.size(3)),
+                head_length,
+                values=values_w.view(
+                    batch_size * num_heads, -1, values_w.size(3)))
+            reads = reads.view(batch_size, num_heads, query_steps, -1)
+
+        all_reads = reads.permute(0, 2, 1, 3).contiguous()\
+            .view(batch_size, query_steps, -1)
         output = self.linear(all_reads)
-        return output, all_scores
+        if return_scores:
+            scores = scores.view(batch_size, num_heads, query_steps, -1)
+            all_scores = [scores[:, h] for h in range(num_heads)]
+            return output, all_scores
+        else:
+            return output, None
@@ -13,15 +13,15 @@ class ScaledDotProductAttention(nn.Module):
             values = context
 
         raw_scores = torch.bmm(query, context.permute(0, 2, 1)) / self.scale
-        for b, l in enumerate(length.data.tolist()):
-            if l < raw_scores.size(2):
-                raw_scores.data[b,:,l:].fill_(float("-inf"))
+        steps = torch.arange(raw_scores.size(2), device=length.device)
+        context_mask = steps.view(1, -1) >= length.view(-1, 1)
+        raw_scores.data.masked_fill_(context_mask.unsqueeze(1), float("-inf"))
 
         scores = F.softmax(raw_scores, 2)
 
-        for b, l in enumerate(length.data.tolist()):
-            if l < raw_scores.size(1):
-                scores.data[b,l:].fill_(0)
+        steps = torch.arange(raw_scores.size(1), device=length.device)
+        query_mask = steps.view(1, -1) >= length.view(-1, 1)
+        scores.data.masked_fill_(query_mask.unsqueeze(2), 0)
         
         attended_values = torch.bmm(scores, values)
 
@@ -101,7 +101,7 @@ class ChengAndLapataSentenceExtractor(nn.Module):
         weighted_decoder_input = sentence_embeddings[:,:-1] \
             * targets.view(batch_size, -1,1)[:,:-1]
 
-        start_emb = self.decoder_start.view(1, 1, -1).repeat(batch_size, 1, 1)
+        start_emb = self.decoder_start.view(1, 1, -1).expand(batch_size, 1, -1)
         decoder_input = torch.cat([start_emb, weighted_decoder_input], 1)
 
         packed_decoder_input = nn.utils.rnn.pack_padded_sequence(
@@ -112,6 +112,13 @@ class ChengAndLapataSentenceExtractor(nn.Module):
         logits = self.mlp(mlp_input).squeeze(-1)
         return logits
 
+    def _prune_state(self, rnn_state, size):
+        # cuDNN requires contiguous hidden states.
+        if isinstance(rnn_state, tuple):
+            return tuple([state[:,:size].contiguous() for state in rnn_state])
+        else:
+            return rnn_state[:,:size].contiguous()
+
     def _predict_forward(self, sentence_embeddings, num_sentences):
  
         length_list = num_sentences.data.tolist()
@@ -128,29 +135,62 @@ class ChengAndLapataSentenceExtractor(nn.Module):
             packed_sentence_embeddings, 
             batch_first=False)
  
-        encoder_outputs = encoder_output.split(1, dim=0)
-        start_emb = self.decoder_start.view(1, 1, -1).repeat(1, batch_size, 1)
+        # The first MLP layer is applied to [encoder; decoder] outputs. The
+        # encoder half does not change with the decoder state, so compute it
+        # for all steps at once and only project the decoder output per step.
+        first_layer = self.mlp[0]
+        encoder_size = encoder_output.size(2)
+        encoder_projs = F.linear(
+            encoder_output, first_layer.weight[:,:encoder_size], 
+            first_layer.bias).split(1, dim=0)
+        decoder_weight = first_layer.weight[:,encoder_size:]
+        mlp_rest = self.mlp[1:]
+
+        start_emb = self.decoder_start.view(1, 1, -1).expand(1, batch_size, -1)
         decoder_inputs = sentence_embeddings.permute(1,0,2).split(1, dim=0)
 
         logits = []
         decoder_input_t = start_emb
+        active = batch_size
         for t in range(sequence_size):
+
+            # Documents are sorted by length, so the ones with a sentence at
+            # step t are a prefix of the batch. Drop finished documents from
+            # the decoder and pad their logits back in afterwards.
+            while active > 1 and length_list[active - 1] <= t:
+                active -= 1
+            if active < decoder_input_t.size(1):
+                decoder_input_t = decoder_input_t[:,:active]
+                rnn_state = self._prune_state(rnn_state, active)
+
             decoder_output_t, rnn_state = self.decoder_rnn(
                 decoder_input_t, rnn_state)
             decoder_output_t = F.dropout(
                 decoder_output_t, p=self.rnn_dropout, training=self.training)
-            mlp_input_t = torch.cat([encoder_outputs[t], decoder_output_t], 2)
-            logits_t = self.mlp(mlp_input_t)
-            logits.append(logits_t)
+            mlp_hidden_t = encoder_projs[t][:,:active] \
+                + F.linear(decoder_output_t, decoder_weight)
+            logits_t = mlp_rest(mlp_hidden_t)
 
             if t + 1 != sequence_size:
                 probs_t = torch.sigmoid(logits_t)
-                decoder_input_t = decoder_inputs[t] * probs_t
+                decoder_input_t = decoder_inputs[t][:,:active] * probs_t
+
+            if active < batch_size:
+                logits_t = torch.cat(
+                    [logits_t, logits_t.new_zeros(1, batch_size - active, 1)],
+                    1)
+            logits.append(logits_t)
 
         logits = torch.cat(logits, 0).transpose(1, 0).squeeze(-1)
         return logits
 
-    def forward(self, sentence_embeddings, num_sentences, targets=None):
+    @property
+    def needs_targets(self):
+        # Teacher forcing feeds the targets to the decoder.
+        return self.training and self.teacher_forcing
+
+    def forward(self, sentence_embeddings, num_sentences, targets=None,
+                return_attention=True):
         if self.training and self.teacher_forcing:
             return self._teacher_forcing_forward(
                 sentence_embeddings, num_sentences, targets)
@@ -67,7 +67,12 @@ class RNNSentenceExtractor(nn.Module):
             "--mlp-dropouts", default=[.25], type=float, nargs="+")
         return parser
 
-    def forward(self, sentence_embeddings, num_sentences, targets=None):
+    @property
+    def needs_targets(self):
+        return False
+
+    def forward(self, sentence_embeddings, num_sentences, targets=None,
+                return_attention=True):
         batch_size = sentence_embeddings.size(0)
 
         packed_sentence_embeddings = nn.utils.rnn.pack_padded_sequence(
@@ -78,11 +83,11 @@ class RNNSentenceExtractor(nn.Module):
         packed_rnn_output, _ = self.rnn(packed_sentence_embeddings)
         mlp_input, _ = nn.utils.rnn.pad_packed_sequence(
             packed_rnn_output, 
-            batch_first=False)
+            batch_first=True)
         mlp_input = F.dropout(
             mlp_input, p=self.rnn_dropout, training=self.training,
             inplace=True)
-        logits = self.mlp(mlp_input).permute(1, 0, 2).squeeze(-1)
+        logits = self.mlp(mlp_input).squeeze(-1)
         return logits
 
     def initialize_parameters(self, logger=None):
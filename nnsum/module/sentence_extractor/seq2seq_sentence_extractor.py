@@ -98,7 +98,7 @@ class Seq2SeqSentenceExtractor(nn.Module):
         return parser
 
     def _start_decoder(self, batch_size, rnn_state):
-        start_emb = self.decoder_start.view(1, 1, -1).repeat(1, batch_size, 1)
+        start_emb = self.decoder_start.view(1, 1, -1).expand(1, batch_size, -1)
         _, updated_rnn_state = self.decoder_rnn(start_emb, rnn_state)
         return updated_rnn_state
 
@@ -111,7 +111,12 @@ class Seq2SeqSentenceExtractor(nn.Module):
             output, p=self.rnn_dropout, training=self.training, inplace=True)
         return output, updated_rnn_state
 
-    def forward(self, sentence_embeddings, num_sentences, targets=None):
+    @property
+    def needs_targets(self):
+        return False
+
+    def forward(self, sentence_embeddings, num_sentences, targets=None,
+                return_attention=True):
 
         batch_size = sentence_embeddings.size(0)
 
@@ -5,6 +5,10 @@ import torch.nn.functional as F
 import argparse
 
 
+# Number of positions cached up front, longer documents grow the cache.
+_POSITIONS_CACHE_SIZE = 4096
+
+
 class SummaRunnerSentenceExtractor(nn.Module):
     def __init__(self, input_size, hidden_size=100, num_layers=1, 
                  bidirectional=True, cell="gru", rnn_dropout=0.0,
@@ -53,6 +57,7 @@ class SummaRunnerSentenceExtractor(nn.Module):
         self.bias = nn.Parameter(torch.FloatTensor([0]))
 
         self.max_position_weights = max_position_weights
+        self._positions_cache = {}
         self.segments = segments
         self.position_encoder = nn.Sequential(
             nn.Embedding(max_position_weights + 1, position_size, 
@@ -87,28 +92,53 @@ class SummaRunnerSentenceExtractor(nn.Module):
             "--position-size", type=int, default=16, required=False)
         return parser
 
-    def novelty(self, sentence_state, summary_rep):
-        sim = self.similarity(
-            sentence_state.squeeze(1), torch.tanh(summary_rep).squeeze(1))
+    def novelty(self, weighted_state, summary_rep):
+        # weighted_state is the sentence state already multiplied by the
+        # bilinear similarity weight.
+        sim = (weighted_state * torch.tanh(summary_rep)).sum(2)
         novelty = -sim.squeeze(1)
         return novelty
 
+    def __getstate__(self):
+        # Cached positions are tied to the device they were made on, so
+        # leave them out of pickled (e.g. checkpointed) models.
+        state = dict(self.__dict__)
+        state["_positions_cache"] = {}
+        return state
+
+    def _positions(self, size, device):
+        # Reuse a 1..N position tensor per device across calls, growing it
+        # if a longer document shows up. This is a plain attribute rather
+        # than a buffer so it never ends up in the state dict.
+        cache = self.__dict__.setdefault("_positions_cache", {})
+        positions = cache.get(device)
+        if positions is None or positions.device != device \
+                or positions.size(0) < size:
+            positions = torch.arange(
+                1, max(size, _POSITIONS_CACHE_SIZE) + 1, device=device)
+            cache[device] = positions
+        return positions[:size]
+
     def position_logits(self, length):
         batch_size = length.size(0)
-        abs_pos = torch.arange(
-            1, length.data[0].item() + 1, device=length.device)\
-            .view(1, -1).repeat(batch_size, 1)
+        abs_pos = self._positions(length.data[0].item(), length.device)\
+            .view(1, -1).expand(batch_size, -1)
 
         chunk_size = (length.float() / self.segments).round().view(-1, 1)
         rel_pos = (abs_pos.float() / chunk_size).ceil().clamp(
             0, self.segments).long()
 
-        abs_pos.data.clamp_(0, self.max_position_weights)
+        abs_pos = abs_pos.clamp(0, self.max_position_weights)
         pos_logits = self.position_encoder(abs_pos).squeeze(2)
         seg_logits = self.segment_encoder(rel_pos).squeeze(2)
         return pos_logits, seg_logits
 
-    def forward(self, sentence_embeddings, num_sentences, targets=None):
+    @property
+    def needs_targets(self):
+        return False
+
+    def forward(self, sentence_embeddings, num_sentences, targets=None,
+                return_attention=True):
 
         packed_sentence_embeddings = nn.utils.rnn.pack_padded_sequence(
             sentence_embeddings, 
@@ -136,11 +166,16 @@ class SummaRunnerSentenceExtractor(nn.Module):
         static_logits = content_logits + salience_logits + pos_logits \
             + seg_logits + self.bias.unsqueeze(0)
         
+        # The bilinear novelty weights do not depend on the running summary,
+        # so apply them to all sentence states at once outside the loop.
+        weighted_states = torch.matmul(
+            sentence_states, self.similarity.weight[0]).split(1, dim=1)
+
         sentence_states = sentence_states.split(1, dim=1)
         summary_rep = torch.zeros_like(sentence_states[0])
         logits = []
         for step in range(num_sentences[0].item()):
-            novelty_logits = self.novelty(sentence_states[step], summary_rep)
+            novelty_logits = self.novelty(weighted_states[step], summary_rep)
             logits_step = static_logits[:, step] + novelty_logits
             
             prob = torch.sigmoid(logits_step)
@@ -38,7 +38,12 @@ class TransformerSentenceExtractor(nn.Module):
         self.output_layer = nn.Linear(input_size, 1)
 
 
-    def forward(self, sentence_embeddings, num_sentences, targets=None):
+    @property
+    def needs_targets(self):
+        return False
+
+    def forward(self, sentence_embeddings, num_sentences, targets=None,
+                return_attention=True):
 
         input = sentence_embeddings + self.position_embeddings[
                 :,:sentence_embeddings.size(1)]
@@ -50,7 +55,7 @@ class TransformerSentenceExtractor(nn.Module):
                 self.layer_norms1, self.layer_norms2):
             output, scores = attn(
                 input, input, input,
-                num_sentences)
+                num_sentences, return_scores=return_attention)
             all_scores.append(scores)
             input = norm1(output + input)
 
@@ -60,7 +65,10 @@ class TransformerSentenceExtractor(nn.Module):
 
         logits = self.output_layer(input).squeeze(2)
 
-        return logits, all_scores
+        if return_attention:
+            return logits, all_scores
+        else:
+            return logits, None
 
     def initialize_parameters(self, logger=None):
         if logger:
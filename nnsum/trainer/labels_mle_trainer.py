@@ -219,7 +219,8 @@ def create_evaluator(model, dataloader, summary_length=100, pos_weight=None,
                 weight=mask, 
                 reduction='sum')
 
-            texts = model.predict(batch, max_length=summary_length)
+            texts = model.predict(
+                batch, max_length=summary_length, logits=logits)
 
             for text, ref_paths in zip(texts, batch.reference_paths):
                 summary = "\n".join(text)                
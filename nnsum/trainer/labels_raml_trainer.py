@@ -21,40 +21,65 @@ def labels_raml_trainer(model, optimizer, train_loader,
                        teacher_forcing=teacher_forcing,
                        create_trainer_fn=create_trainer)
 
+def expected_labels(targets, scores):
+    sample_labels = targets.clamp(min=0).float()
+    return (scores.unsqueeze(2) * sample_labels).sum(1)
+
+def expected_label_bce(logits, targets, scores, pos_weight=None):
+    # targets is batch_size x samples x seq_size and scores is 
+    # batch_size x samples (already normalized to be probs). Binary 
+    # cross-entropy is linear in the target, so the expected loss over
+    # the samples equals the loss against the expected label. This only
+    # holds when the logits do not depend on the targets.
+    mask = targets[:,0].gt(-1).float()
+    expected_targets = expected_labels(targets, scores)
+    if pos_weight is not None:
+        pos_weight = logits.new_tensor([pos_weight])
+    return F.binary_cross_entropy_with_logits(
+        logits, expected_targets, weight=mask, pos_weight=pos_weight,
+        reduction='sum')
+
+def sample_bce(logits, targets, scores, sample, pos_weight=None):
+    # Score weighted loss of a single sample's labels.
+    mask = targets[:,sample].gt(-1).float()
+    weight = mask * scores[:,sample].view(-1, 1)
+    if pos_weight is not None:
+        pos_weight = logits.new_tensor([pos_weight])
+    return F.binary_cross_entropy_with_logits(
+        logits, targets[:,sample].clamp(min=0).float(), weight=weight,
+        pos_weight=pos_weight, reduction='sum')
+
 def create_trainer(model, optimizer, pos_weight=None, grad_clip=5, gpu=-1):
 
     def _update(engine, batch):
         model.train()
         batch = batch.to(gpu)
         optimizer.zero_grad()
-        logits = model(
-            batch, decoder_supervision=batch.targets.float())
-        mask = batch.targets.gt(-1).float()
-        total_sentences_batch = int(batch.num_sentences.data.sum())
-        
-        if pos_weight is not None:
-            mask.data.masked_fill_(batch.targets.data.eq(1), pos_weight)
-        # mask is batch_size x samples x seq_size
-        print(mask)
-        # targets is batch_size x samples x seq_size 
-        print(batch.targets)
-        # scores is batch_size x samples
-        # scores has already been normalized to be probs. 
-        print(batch.scores)
-        print(mask.size())
-        print(batch.targets.size())
-        print(batch.scores.size())
-        exit()
 
-        ### yan TODO tensorize this part ###
+        total_sentences_batch = int(batch.num_sentences.data.sum())
 
-        bce = F.binary_cross_entropy_with_logits(
-            logits, batch.targets.float(),
-            weight=mask, 
-            reduction='sum')
+        if model.sentence_extractor.needs_targets:
+            # Teacher forced logits depend on the sampled labels, so each
+            # sample needs its own forward pass.
+            bce = 0
+            for sample in range(batch.targets.size(1)):
+                sample_targets = batch.targets[:,sample].clamp(min=0).float()
+                logits = model(batch, decoder_supervision=sample_targets)
+                sample_loss = sample_bce(
+                    logits, batch.targets, batch.scores, sample,
+                    pos_weight=pos_weight)
+                (sample_loss / float(total_sentences_batch)).backward()
+                bce += sample_loss.detach()
+        else:
+            logits = model(
+                batch, 
+                decoder_supervision=expected_labels(
+                    batch.targets, batch.scores))
+            bce = expected_label_bce(
+                logits, batch.targets, batch.scores, pos_weight=pos_weight)
+            avg_bce = bce / float(total_sentences_batch)
+            avg_bce.backward()
 
-        avg_bce = bce / float(total_sentences_batch)
-        avg_bce.backward()
         for param in model.parameters():
             param.grad.data.clamp_(-grad_clip, grad_clip)
         optimizer.step()
@@ -65,5 +90,3 @@ def create_trainer(model, optimizer, pos_weight=None, grad_clip=5, gpu=-1):
     trainer = Engine(_update)
    
     return trainer
-
-
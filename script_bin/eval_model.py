@@ -19,6 +19,8 @@ def main():
     parser.add_argument("--loader-workers", type=int, default=None)
     parser.add_argument(
         "--remove-stopwords", action="store_true", default=False)
+    parser.add_argument(
+        "--int8", action="store_true", default=False)
     parser.add_argument(
         "--inputs", type=pathlib.Path, required=True)
     parser.add_argument(
@@ -35,6 +37,10 @@ def main():
 
     print("Loading model...", end="", flush=True)
     model = torch.load(args.model, map_location=lambda storage, loc: storage)
+    if args.int8:
+        if args.gpu > -1:
+            raise Exception("--int8 is only supported on cpu (--gpu -1).")
+        model = model.to_int8_inference()
     if args.gpu > -1:
         model.cuda(args.gpu)
     vocab = model.embeddings.vocab
@@ -0,0 +1,62 @@
+import unittest
+
+import torch
+import torch.nn.functional as F
+from nnsum.module.sentence_extractor import (
+    RNNSentenceExtractor, ChengAndLapataSentenceExtractor)
+from nnsum.trainer.labels_raml_trainer import expected_label_bce
+
+
+class TestLabelsRAMLTrainer(unittest.TestCase):
+
+    def test_expected_label_bce(self):
+        torch.manual_seed(0)
+        extractor = RNNSentenceExtractor(5, hidden_size=4, mlp_layers=[4])
+        extractor.train()
+        self.assertFalse(extractor.needs_targets)
+
+        sentence_embeddings = torch.randn(2, 4, 5)
+        num_sentences = torch.LongTensor([4, 3])
+        # batch_size x samples x seq_size, second document has a padded 
+        # sentence and a padded sample.
+        targets = torch.LongTensor(
+            [[[1, 0, 0, 1], [0, 1, 0, 0], [1, 1, 0, 0]],
+             [[0, 1, 1, -1], [1, 0, 0, -1], [-1, -1, -1, -1]]])
+        scores = torch.FloatTensor([[.5, .3, .2], [.6, .4, 0.]])
+        pos_weight = 3.
+
+        logits = extractor(sentence_embeddings, num_sentences)
+        bce = expected_label_bce(logits, targets, scores, 
+                                 pos_weight=pos_weight)
+
+        expected_bce = 0
+        for sample in range(targets.size(1)):
+            sample_targets = targets[:,sample]
+            mask = sample_targets.gt(-1).float()
+            mask.masked_fill_(sample_targets.eq(1), pos_weight)
+            sample_bce = F.binary_cross_entropy_with_logits(
+                logits, sample_targets.clamp(min=0).float(), weight=mask,
+                reduction='none').sum(1)
+            expected_bce += (scores[:,sample] * sample_bce).sum()
+
+        self.assertTrue(torch.allclose(bce, expected_bce))
+
+    def test_needs_targets(self):
+        extractor = ChengAndLapataSentenceExtractor(5, hidden_size=4)
+        extractor.train()
+        self.assertTrue(extractor.needs_targets)
+        extractor.teacher_forcing = False
+        self.assertFalse(extractor.needs_targets)
+        extractor.teacher_forcing = True
+        extractor.eval()
+        self.assertFalse(extractor.needs_targets)
+
+def suite():
+    suite = unittest.TestSuite()
+    suite.addTest(TestLabelsRAMLTrainer("test_expected_label_bce"))
+    suite.addTest(TestLabelsRAMLTrainer("test_needs_targets"))
+    return suite
+
+if __name__ == '__main__':
+    runner = unittest.TextTestRunner()
+    runner.run(suite())
@@ -0,0 +1,58 @@
+import unittest
+
+import torch
+import torch.nn.functional as F
+from nnsum.module.attention import MultiHeadAttention
+
+
+class TestMultiHeadAttention(unittest.TestCase):
+
+    def setUp(self):
+        torch.manual_seed(0)
+        self.mha = MultiHeadAttention(8, num_heads=3, head_size=4)
+        self.inputs = torch.randn(3, 5, 8)
+        self.length = torch.LongTensor([5, 3, 1])
+
+    @unittest.skipUnless(hasattr(F, "scaled_dot_product_attention"),
+                         "fused attention requires torch>=2.0")
+    def test_fused_matches_manual(self):
+        output, scores = self.mha(
+            self.inputs, self.inputs, self.inputs, self.length)
+        fused_output, fused_scores = self.mha(
+            self.inputs, self.inputs, self.inputs, self.length,
+            return_scores=False)
+
+        self.assertTrue(fused_scores is None)
+        self.assertEqual(len(scores), 3)
+        # Padded query rows included.
+        self.assertTrue(torch.allclose(output, fused_output, atol=1e-6))
+
+    def test_matches_per_head_loop(self):
+        output, scores = self.mha(
+            self.inputs, self.inputs, self.inputs, self.length)
+
+        expected_reads = []
+        expected_scores = []
+        for context_op, query_op, values_op in self.mha.input_heads:
+            reads, head_scores = self.mha.attention(
+                context_op(self.inputs), query_op(self.inputs), self.length,
+                values=values_op(self.inputs))
+            expected_reads.append(reads)
+            expected_scores.append(head_scores)
+        expected_output = self.mha.linear(torch.cat(expected_reads, 2))
+
+        self.assertTrue(torch.allclose(output, expected_output, atol=1e-6))
+        self.assertEqual(len(scores), len(expected_scores))
+        for head_scores, head_expected_scores in zip(scores, expected_scores):
+            self.assertTrue(
+                torch.allclose(head_scores, head_expected_scores, atol=1e-6))
+
+def suite():
+    suite = unittest.TestSuite()
+    suite.addTest(TestMultiHeadAttention("test_fused_matches_manual"))
+    suite.addTest(TestMultiHeadAttention("test_matches_per_head_loop"))
+    return suite
+
+if __name__ == '__main__':
+    runner = unittest.TextTestRunner()
+    runner.run(suite())
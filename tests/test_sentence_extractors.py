@@ -0,0 +1,134 @@
+import unittest
+import io
+
+import torch
+import torch.nn as nn
+from nnsum.module.sentence_extractor import (
+    ChengAndLapataSentenceExtractor, SummaRunnerSentenceExtractor)
+
+
+class TestChengAndLapataSentenceExtractor(unittest.TestCase):
+
+    def setUp(self):
+        torch.manual_seed(0)
+        self.sentence_embeddings = torch.randn(3, 5, 6)
+        self.num_sentences = torch.LongTensor([5, 3, 1])
+
+    def _make_extractor(self, cell):
+        extractor = ChengAndLapataSentenceExtractor(
+            6, hidden_size=4, num_layers=2, cell=cell, mlp_layers=[4])
+        extractor.eval()
+        return extractor
+
+    def test_pruned_predict_forward(self):
+        for cell in ["gru", "lstm"]:
+            extractor = self._make_extractor(cell)
+            logits = extractor(self.sentence_embeddings, self.num_sentences)
+
+            for b, size in enumerate(self.num_sentences.tolist()):
+                doc_logits = extractor(
+                    self.sentence_embeddings[b:b+1,:size],
+                    self.num_sentences[b:b+1])
+                self.assertTrue(
+                    torch.allclose(logits[b:b+1,:size], doc_logits, 
+                                   atol=1e-6))
+                self.assertTrue(torch.all(logits[b,size:] == 0))
+
+    def _reference_predict_forward(self, extractor, sentence_embeddings,
+                                   num_sentences):
+        # Decode every document for every step and apply the full MLP to
+        # the concatenated encoder and decoder outputs.
+        batch_size, sequence_size, _ = sentence_embeddings.size()
+        packed_sentence_embeddings = nn.utils.rnn.pack_padded_sequence(
+            sentence_embeddings.permute(1, 0, 2), 
+            num_sentences.tolist(), batch_first=False)
+        encoder_output, rnn_state = extractor._apply_rnn(
+            extractor.encoder_rnn, packed_sentence_embeddings,
+            batch_first=False)
+        encoder_outputs = encoder_output.split(1, dim=0)
+        decoder_inputs = sentence_embeddings.permute(1, 0, 2).split(1, dim=0)
+
+        logits = []
+        decoder_input_t = extractor.decoder_start.view(1, 1, -1)\
+            .repeat(1, batch_size, 1)
+        for t in range(sequence_size):
+            decoder_output_t, rnn_state = extractor.decoder_rnn(
+                decoder_input_t, rnn_state)
+            logits_t = extractor.mlp(
+                torch.cat([encoder_outputs[t], decoder_output_t], 2))
+            logits.append(logits_t)
+            decoder_input_t = decoder_inputs[t] * torch.sigmoid(logits_t)
+        return torch.cat(logits, 0).transpose(1, 0).squeeze(-1)
+
+    def test_split_mlp_projection(self):
+        for cell in ["gru", "lstm"]:
+            extractor = self._make_extractor(cell)
+            logits = extractor(self.sentence_embeddings, self.num_sentences)
+            expected_logits = self._reference_predict_forward(
+                extractor, self.sentence_embeddings, self.num_sentences)
+
+            for b, size in enumerate(self.num_sentences.tolist()):
+                self.assertTrue(
+                    torch.allclose(logits[b,:size], expected_logits[b,:size],
+                                   atol=1e-6))
+
+class TestSummaRunnerSentenceExtractor(unittest.TestCase):
+
+    def setUp(self):
+        torch.manual_seed(0)
+        self.sentence_embeddings = torch.randn(3, 5, 6)
+        self.num_sentences = torch.LongTensor([5, 3, 1])
+        self.extractor = SummaRunnerSentenceExtractor(
+            6, hidden_size=4, sentence_size=4, document_size=4,
+            segment_size=4, position_size=4)
+        self.extractor.eval()
+
+    def test_positions_cache_not_pickled(self):
+        logits = self.extractor(self.sentence_embeddings, self.num_sentences)
+
+        # Simulate a checkpoint written after running on a gpu.
+        self.extractor._positions_cache[torch.device("cuda:0")] = \
+            torch.arange(1, 6)
+        buffer = io.BytesIO()
+        torch.save(self.extractor, buffer)
+        buffer.seek(0)
+        extractor = torch.load(
+            buffer, map_location=lambda storage, loc: storage,
+            weights_only=False)
+
+        self.assertEqual(extractor._positions_cache, {})
+        self.assertEqual(len(self.extractor._positions_cache), 2)
+        self.assertTrue(
+            torch.allclose(
+                extractor(self.sentence_embeddings, self.num_sentences),
+                logits))
+
+    def test_positions_cache_device_mismatch(self):
+        logits = self.extractor(self.sentence_embeddings, self.num_sentences)
+
+        # A cached tensor on the wrong device is rebuilt, not reused.
+        cpu = torch.device("cpu")
+        self.extractor._positions_cache[cpu] = torch.arange(
+            1, 6, device="meta")
+        self.assertTrue(
+            torch.allclose(
+                self.extractor(self.sentence_embeddings, self.num_sentences),
+                logits))
+        self.assertEqual(self.extractor._positions_cache[cpu].device, cpu)
+
+def suite():
+    suite = unittest.TestSuite()
+    suite.addTest(
+        TestChengAndLapataSentenceExtractor("test_pruned_predict_forward"))
+    suite.addTest(
+        TestChengAndLapataSentenceExtractor("test_split_mlp_projection"))
+    suite.addTest(
+        TestSummaRunnerSentenceExtractor("test_positions_cache_not_pickled"))
+    suite.addTest(
+        TestSummaRunnerSentenceExtractor(
+            "test_positions_cache_device_mismatch"))
+    return suite
+
+if __name__ == '__main__':
+    runner = unittest.TextTestRunner()
+    runner.run(suite())
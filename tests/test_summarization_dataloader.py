@@ -166,6 +166,47 @@ class TestSummarizationDataLoader(unittest.TestCase):
             shutil.rmtree(inputs_dir)
             shutil.rmtree(targets_dir)
 
+    def test_split(self):
+        try:
+            inputs_dir, targets_dir, ref_dir, vocab = self.create_dummy_data()
+
+            dataset = SummarizationDataset(
+                vocab, inputs_dir, targets_dir=targets_dir,
+                references_dir=ref_dir) 
+            loader = SummarizationDataLoader(
+                dataset, batch_size=5, shuffle=False)
+            batch = next(iter(loader))
+            batches = batch.split(2)
+
+            self.assertEqual([len(b.id) for b in batches], [2, 2, 1])
+            self.assertEqual(
+                sum([b.id for b in batches], []), batch.id)
+
+            for i, b in enumerate(batches):
+                start = 2 * i
+                stop = start + len(b.id)
+                doc_size = batch.num_sentences[start].item()
+                self.assertEqual(b.document.size(1), doc_size)
+                self.assertTrue(
+                    torch.all(b.num_sentences 
+                              == batch.num_sentences[start:stop]))
+                self.assertTrue(
+                    torch.all(b.document == batch.document[
+                        start:stop,:doc_size,:b.document.size(2)]))
+                self.assertTrue(
+                    torch.all(b.targets 
+                              == batch.targets[start:stop,:doc_size]))
+                self.assertTrue(
+                    b.reference_paths == batch.reference_paths[start:stop])
+
+            # The last document only has two sentences so its batch is 
+            # trimmed.
+            self.assertEqual(batches[-1].document.size(1), 2)
+
+        finally:
+            shutil.rmtree(inputs_dir)
+            shutil.rmtree(targets_dir)
+
 
 if __name__ == '__main__':
     unittest.main() 
@@ -1,13 +1,34 @@
 import unittest
+from unittest import mock
 
 import torch
 from nnsum.model.summarization_model import SummarizationModel
 from nnsum.module import EmbeddingContext
+from nnsum.data.summarization_dataloader import SummarizationDataLoader
 import nnsum
 
 from collections import namedtuple
 
 
+def make_batch():
+    # Four documents sorted by decreasing number of sentences.
+    document = torch.LongTensor(
+        [[[1, 2, 3, 4], [5, 6, 0, 0], [7, 8, 9, 0]],
+         [[10, 11, 0, 0], [12, 13, 14, 15], [16, 0, 0, 0]],
+         [[17, 18, 19, 0], [20, 21, 0, 0], [0, 0, 0, 0]],
+         [[22, 23, 24, 25], [0, 0, 0, 0], [0, 0, 0, 0]]])
+    num_sentences = torch.LongTensor([3, 3, 2, 1])
+    sentence_lengths = torch.LongTensor(
+        [[4, 2, 3], [2, 4, 1], [3, 2, 0], [4, 0, 0]])
+    sentence_texts = [["d{}s{}".format(d, s) for s in range(size)]
+                      for d, size in enumerate(num_sentences.tolist())]
+    return SummarizationDataLoader.SummarizationBatch(
+        ["d0", "d1", "d2", "d3"], document, None, num_sentences,
+        sentence_lengths, None, sentence_texts,
+        [lengths[:size] for lengths, size
+         in zip(sentence_lengths, num_sentences.tolist())])
+
+
 class TestSummarizationModel(unittest.TestCase):
 
     def test_prepare_input(self):
@@ -106,11 +127,77 @@ class TestSummarizationModel(unittest.TestCase):
 
         self.assertTrue(torch.all(sorted_enc_sent == expected_enc_sent))
 
+    def test_predict_out_of_memory_split(self):
+
+        def fake_predict(input, return_indices=False, max_length=100,
+                         logits=None):
+            if len(input.id) > 2:
+                raise RuntimeError("CUDA out of memory")
+            text = [[doc_id] for doc_id in input.id]
+            pos = [[i] for i in range(len(input.id))]
+            return text, pos
+
+        batch = make_batch()
+        model = SummarizationModel(None, None, None)
+        with mock.patch.object(model, "_predict",
+                               side_effect=fake_predict) as predict:
+            text, pos = model.predict(batch, return_indices=True)
+            self.assertEqual(text, [["d0"], ["d1"], ["d2"], ["d3"]])
+            self.assertEqual(pos, [[0], [1], [0], [1]])
+            self.assertEqual(predict.call_count, 3)
+
+            # The smaller batch size is remembered, so the next batch of
+            # the same shape is split without running out of memory.
+            predict.reset_mock()
+            self.assertEqual(
+                model.predict(batch), [["d0"], ["d1"], ["d2"], ["d3"]])
+            self.assertEqual(predict.call_count, 2)
+
+        # The limit belongs to the model that ran out of memory, a fresh
+        # model tries the whole batch first.
+        other_model = SummarizationModel(None, None, None)
+        with mock.patch.object(other_model, "_predict",
+                               side_effect=fake_predict) as predict:
+            other_model.predict(batch)
+            self.assertEqual(len(predict.call_args_list[0][0][0].id), 4)
+            self.assertEqual(predict.call_count, 3)
+
+    def test_to_int8_inference(self):
+        vocab = nnsum.io.Vocab.from_word_list(
+            [w for w in 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvw'])
+        for cell, rnn_type in [("gru", torch.nn.GRU),
+                               ("lstm", torch.nn.LSTM)]:
+            emb_ctx = EmbeddingContext(vocab, 5)
+            avg_enc = nnsum.module.sentence_encoder.AveragingSentenceEncoder(
+                5)
+            extractor = nnsum.module.sentence_extractor.RNNSentenceExtractor(
+                5, hidden_size=4, cell=cell, mlp_layers=[4])
+            model = SummarizationModel(emb_ctx, avg_enc, extractor)
+            model.train()
+            device = next(model.parameters()).device
+
+            int8_model = model.to_int8_inference()
+            self.assertFalse(int8_model.training)
+            self.assertFalse(type(int8_model.sentence_extractor.rnn)
+                             is rnn_type)
+            text, pos = int8_model.predict(
+                make_batch(), return_indices=True, max_length=100)
+            self.assertEqual(len(text), 4)
+            for doc_pos, size in zip(pos, [3, 3, 2, 1]):
+                self.assertTrue(all([p < size for p in doc_pos]))
+
+            # The original model is left untouched.
+            self.assertTrue(type(model.sentence_extractor.rnn) is rnn_type)
+            self.assertTrue(model.training)
+            self.assertEqual(next(model.parameters()).device, device)
+
 def suite():
     suite = unittest.TestSuite()
     suite.addTest(TestSummarizationModel("test_prepare_input"))
     suite.addTest(TestSummarizationModel("test_sort_sentences"))
     suite.addTest(TestSummarizationModel("test_sorted_sentence_encoder"))
+    suite.addTest(TestSummarizationModel("test_predict_out_of_memory_split"))
+    suite.addTest(TestSummarizationModel("test_to_int8_inference"))
     return suite
 
 if __name__ == '__main__':